@@ -1,21 +1,66 @@
 """Database utilities for PostGIS operations."""
 
+import io
 import os
+import csv
+import struct
 import logging
+import threading
 from contextlib import contextmanager
-from typing import Optional, Dict, Any, Generator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Generator, Union
 import psycopg2
 from psycopg2 import sql
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool
+import numpy as np
 import pandas as pd
 import geopandas as gpd
-from shapely import wkb
+import shapely
 from dotenv import load_dotenv
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Binary COPY framing: signature, flags field, header extension length
+_PGCOPY_HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('>ii', 0, 0)
+_PGCOPY_TRAILER = struct.pack('>h', -1)
+_PGCOPY_NULL = struct.pack('>i', -1)
+
+# Rows per INSERT page (execute_values) and per savepoint in append mode
+_PAGE_SIZE = 1000
+
+# Statements prepared once per pooled connection (parsed and planned once
+# per session instead of on every call). Only core catalog queries belong
+# here: PREPARE resolves functions, so a PostGIS call would make every
+# connection fail on a database without the extension
+_PREPARED_STATEMENTS = """
+    PREPARE table_exists_q (text, text) AS
+        SELECT EXISTS (
+            SELECT FROM information_schema.tables 
+            WHERE table_schema = $1 
+            AND table_name = $2
+        );
+"""
+
+
+class _PreparingConnectionPool(ThreadedConnectionPool):
+    """Connection pool that prepares _PREPARED_STATEMENTS on each new connection."""
+    
+    def _connect(self, key=None):
+        conn = super()._connect(key)
+        with conn.cursor() as cur:
+            cur.execute(_PREPARED_STATEMENTS)
+        conn.commit()
+        return conn
+
+
+# Shared connection pool, created on first use by get_db_connection
+_POOL_MAXCONN = 8
+_POOL: Optional[_PreparingConnectionPool] = None
+_POOL_LOCK = threading.Lock()
+
 
 def get_db_config() -> Dict[str, str]:
     """Get database configuration from environment variables."""
@@ -34,27 +79,49 @@ def get_connection_string() -> str:
     return f"postgresql://{config['user']}:{config['password']}@{config['host']}:{config['port']}/{config['database']}"
 
 
+def _get_pool() -> _PreparingConnectionPool:
+    """Return the module-level connection pool, creating it on first use."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = _PreparingConnectionPool(minconn=1, maxconn=_POOL_MAXCONN, **get_db_config())
+        return _POOL
+
+
 @contextmanager
 def get_db_connection(**kwargs) -> Generator[psycopg2.extensions.connection, None, None]:
-    """Context manager for database connections."""
-    config = get_db_config()
-    config.update(kwargs)
+    """
+    Context manager for database connections.
+    
+    Connections are leased from a shared pool so that helpers called in
+    sequence reuse the same backends instead of reconnecting each time.
+    Passing connection overrides as kwargs opens a dedicated connection.
+    """
+    pool = None if kwargs else _get_pool()
     
     conn = None
     try:
-        conn = psycopg2.connect(**config)
+        if pool:
+            conn = pool.getconn()
+        else:
+            config = get_db_config()
+            config.update(kwargs)
+            conn = psycopg2.connect(**config)
         yield conn
     except psycopg2.Error as e:
-        logger.error(f"Database connection error: {e}")
+        logger.error("Database connection error: %s", e)
         if conn:
             conn.rollback()
         raise
     finally:
-        if conn:
+        if conn and pool:
+            # putconn rolls back any transaction left open by the caller
+            pool.putconn(conn, close=bool(conn.closed))
+        elif conn:
             conn.close()
 
 
-def execute_query(query: str, params: Optional[tuple] = None, fetch: bool = False) -> Optional[list]:
+def execute_query(query: Union[str, sql.Composable], params: Optional[tuple] = None, fetch: bool = False) -> Optional[list]:
     """Execute a SQL query with optional parameters."""
     with get_db_connection() as conn:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
@@ -65,93 +132,400 @@ def execute_query(query: str, params: Optional[tuple] = None, fetch: bool = Fals
                 if fetch:
                     return cur.fetchall()
                     
-                logger.info(f"Query executed successfully: {cur.rowcount} rows affected")
+                logger.info("Query executed successfully: %s rows affected", cur.rowcount)
                 return None
                 
             except psycopg2.Error as e:
-                logger.error(f"Query execution error: {e}")
+                logger.error("Query execution error: %s", e)
                 conn.rollback()
                 raise
 
 
 def table_exists(table_name: str, schema: str = 'public') -> bool:
     """Check if a table exists in the database."""
-    query = """
-        SELECT EXISTS (
-            SELECT FROM information_schema.tables 
-            WHERE table_schema = %s 
-            AND table_name = %s
-        );
-    """
-    result = execute_query(query, (schema, table_name), fetch=True)
+    result = execute_query("EXECUTE table_exists_q(%s, %s);", (schema, table_name), fetch=True)
     return result[0]['exists'] if result else False
 
 
+def _create_table(cur, gdf: gpd.GeoDataFrame, table_name: str,
+                  geom_col: str = 'geometry', srid: int = 2154,
+                  schema: str = 'public', unlogged: bool = False) -> None:
+    """Issue the CREATE [UNLOGGED] TABLE matching a GeoDataFrame structure (no index)."""
+    # Build CREATE TABLE statement; identifiers are quoted by psycopg2
+    col_defs = [sql.SQL("id SERIAL PRIMARY KEY")]
+    for col in gdf.columns:
+        if col == geom_col:
+            continue
+            
+        dtype = str(gdf[col].dtype)
+        if 'int' in dtype:
+            pg_type = 'INTEGER'
+        elif 'float' in dtype:
+            pg_type = 'DOUBLE PRECISION'
+        elif 'bool' in dtype:
+            pg_type = 'BOOLEAN'
+        else:
+            pg_type = 'TEXT'
+            
+        col_defs.append(sql.SQL("{} {}").format(sql.Identifier(col), sql.SQL(pg_type)))
+    
+    # Add geometry column
+    geom_type = gdf.geometry.iloc[0].geom_type if len(gdf) > 0 else 'Geometry'
+    if geom_type == 'Polygon':
+        geom_type = 'MultiPolygon'
+    elif geom_type == 'LineString':
+        geom_type = 'MultiLineString'
+    elif geom_type == 'Point':
+        geom_type = 'MultiPoint'
+    col_defs.append(sql.SQL("geom geometry({}, {})").format(sql.SQL(geom_type), sql.Literal(int(srid))))
+        
+    create_sql = sql.SQL("CREATE {unlogged}TABLE IF NOT EXISTS {table} ({cols});").format(
+        unlogged=sql.SQL('UNLOGGED ' if unlogged else ''),
+        table=sql.Identifier(schema, table_name),
+        cols=sql.SQL(', ').join(col_defs)
+    )
+    
+    cur.execute(create_sql)
+
+
+def _create_gist_index(cur, table_name: str, schema: str = 'public',
+                       parallel_workers: int = 4) -> None:
+    """
+    Build the GiST index on geom and analyze the table, once the rows are loaded.
+    
+    GiST has no bulk-load path, so maintaining the index during COPY costs
+    a page split per insert; one build at the end is much cheaper. The
+    settings, index and ANALYZE go out in a single round-trip, and the
+    SET LOCAL values only last until the end of the current transaction.
+    """
+    table = sql.Identifier(schema, table_name)
+    cur.execute(sql.SQL("""
+        SET LOCAL max_parallel_maintenance_workers = {workers};
+        SET LOCAL maintenance_work_mem = '1GB';
+        CREATE INDEX IF NOT EXISTS {index} ON {table} USING GIST (geom);
+        ANALYZE {table};
+    """).format(
+        workers=sql.Literal(int(parallel_workers)),
+        index=sql.Identifier(f"{table_name}_geom_idx"),
+        table=table
+    ))
+
+
+def _set_logged(cur, table_name: str, schema: str = 'public') -> None:
+    """Switch a table loaded UNLOGGED back to LOGGED (rewrites it once, with WAL)."""
+    cur.execute(sql.SQL("ALTER TABLE {} SET LOGGED;").format(sql.Identifier(schema, table_name)))
+
+
+def _drop_indexes(cur, table_name: str, schema: str = 'public') -> list:
+    """
+    Drop the secondary indexes of a table and return their definitions.
+    
+    Indexes backing a constraint (primary key, unique) are kept.
+    """
+    cur.execute("""
+        SELECT i.indexrelid::regclass::text, pg_get_indexdef(i.indexrelid)
+        FROM pg_index i
+        WHERE i.indrelid = format('%%I.%%I', %s, %s)::regclass
+        AND NOT EXISTS (
+            SELECT FROM pg_constraint c WHERE c.conindid = i.indexrelid
+        );
+    """, (schema, table_name))
+    indexes = cur.fetchall()
+    
+    if indexes:
+        # regclass::text is already quoted (and qualified when needed)
+        cur.execute(f"DROP INDEX {', '.join(name for name, _ in indexes)};")
+    return [indexdef for _, indexdef in indexes]
+
+
+def _restore_indexes(cur, indexdefs: list, parallel_workers: int = 4) -> None:
+    """Rebuild indexes dropped by _drop_indexes, in a single round-trip."""
+    if not indexdefs:
+        return
+    settings = (f"SET LOCAL max_parallel_maintenance_workers = {int(parallel_workers)};"
+                "SET LOCAL maintenance_work_mem = '1GB';")
+    cur.execute(settings + ''.join(f"{indexdef};" for indexdef in indexdefs))
+
+
+def vacuum_analyze(table_name: str, schema: str = 'public') -> None:
+    """VACUUM ANALYZE a table; VACUUM cannot run inside a transaction block."""
+    with get_db_connection() as conn:
+        autocommit = conn.autocommit
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cur:
+                cur.execute(sql.SQL("VACUUM ANALYZE {};").format(sql.Identifier(schema, table_name)))
+        finally:
+            conn.autocommit = autocommit
+
+
 def create_table_from_gdf(gdf: gpd.GeoDataFrame, table_name: str, 
                          geom_col: str = 'geometry', srid: int = 2154,
-                         schema: str = 'public') -> None:
-    """Create a PostGIS table from a GeoDataFrame structure."""
+                         schema: str = 'public', unlogged: bool = False) -> None:
+    """
+    Create a PostGIS table from a GeoDataFrame structure.
+    
+    With ``unlogged=True`` the table skips WAL; switch it back with
+    ``ALTER TABLE ... SET LOGGED`` once it has been loaded.
+    """
     
     with get_db_connection() as conn:
         with conn.cursor() as cur:
-            # Build CREATE TABLE statement
-            columns = []
-            for col in gdf.columns:
-                if col == geom_col:
-                    continue
-                    
-                dtype = str(gdf[col].dtype)
-                if 'int' in dtype:
-                    pg_type = 'INTEGER'
-                elif 'float' in dtype:
-                    pg_type = 'DOUBLE PRECISION'
-                elif 'bool' in dtype:
-                    pg_type = 'BOOLEAN'
-                else:
-                    pg_type = 'TEXT'
-                    
-                columns.append(f'"{col}" {pg_type}')
-            
-            # Add geometry column
-            geom_type = gdf.geometry.iloc[0].geom_type if len(gdf) > 0 else 'Geometry'
-            if geom_type == 'Polygon':
-                geom_type = 'MultiPolygon'
-            elif geom_type == 'LineString':
-                geom_type = 'MultiLineString'
-            elif geom_type == 'Point':
-                geom_type = 'MultiPoint'
-                
-            create_sql = f"""
-                CREATE TABLE IF NOT EXISTS {schema}.{table_name} (
-                    id SERIAL PRIMARY KEY,
-                    {', '.join(columns)},
-                    geom geometry({geom_type}, {srid})
-                );
-            """
-            
-            cur.execute(create_sql)
+            _create_table(cur, gdf, table_name, geom_col, srid, schema, unlogged)
             
             # Create spatial index
-            cur.execute(f"""
-                CREATE INDEX IF NOT EXISTS {table_name}_geom_idx 
-                ON {schema}.{table_name} USING GIST (geom);
-            """)
+            _create_gist_index(cur, table_name, schema)
             
             conn.commit()
-            logger.info(f"Table {schema}.{table_name} created successfully")
+            logger.info("Table %s.%s created successfully", schema, table_name)
+
+
+def _to_ewkb(geoms, srid: int, hex: bool = True) -> np.ndarray:
+    """
+    Encode geometries to EWKB in a single vectorised shapely call.
+    
+    The SRID is embedded in the EWKB header, so PostGIS accepts the
+    values as-is. Null and empty geometries are encoded as None.
+    """
+    geoms = shapely.set_srid(np.asarray(geoms), srid)
+    ewkb = shapely.to_wkb(geoms, hex=hex, include_srid=True)
+    ewkb[shapely.is_empty(geoms)] = None
+    return ewkb
+
+
+def _prepare_rows(gdf: gpd.GeoDataFrame, cols: list,
+                  geom_col: str, srid: int, hex: bool = True) -> list:
+    """Build insertion tuples (attributes..., EWKB) column-wise, missing values as None."""
+    # tolist() yields native Python scalars that psycopg2 can adapt; NaN
+    # would otherwise be stored as NaN (or 'NaN' in text columns), not NULL
+    geom_values = _to_ewkb(gdf[geom_col].array, srid, hex=hex)
+    columns = [gdf[col].astype(object).where(gdf[col].notna(), None).tolist() for col in cols]
+    return list(zip(*columns, geom_values))
+
+
+def _copy_gdf(cur, gdf: gpd.GeoDataFrame, table: str, schema: str,
+              srid: int, cols: list, geom_col: str = 'geometry') -> int:
+    """
+    Bulk load a GeoDataFrame through COPY FROM STDIN (CSV format).
+    
+    Geometries are written as EWKB hex, which PostGIS parses natively
+    on input. Null values are written as ``\\N`` so that empty strings
+    stay distinct from NULL.
+    
+    Returns:
+        Number of rows sent to the server
+    """
+    # Nulls are substituted column-wise so that csv.writer.writerows
+    # serialises every row in C, without a Python-level loop
+    columns = [
+        gdf[col].astype(object).where(gdf[col].notna(), '\\N').tolist()
+        for col in cols
+    ]
+    geom_values = _to_ewkb(gdf[geom_col].array, srid)
+    geom_values[pd.isna(geom_values)] = '\\N'
+    columns.append(geom_values.tolist())
+    
+    buf = io.StringIO()
+    csv.writer(buf, quoting=csv.QUOTE_MINIMAL).writerows(zip(*columns))
+    buf.seek(0)
+    cur.copy_expert(
+        sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT CSV, NULL '\\N')").format(
+            sql.Identifier(schema, table),
+            sql.SQL(', ').join(map(sql.Identifier, cols + ['geom']))),
+        buf
+    )
+    return len(gdf)
+
+
+def _get_column_types(cur, table: str, schema: str) -> Dict[str, str]:
+    """Map each column of a table to its PostgreSQL type name (udt)."""
+    cur.execute("""
+        SELECT a.attname, t.typname
+        FROM pg_attribute a
+        JOIN pg_type t ON t.oid = a.atttypid
+        WHERE a.attrelid = format('%%I.%%I', %s, %s)::regclass
+        AND a.attnum > 0
+        AND NOT a.attisdropped;
+    """, (schema, table))
+    return dict(cur.fetchall())
+
+
+def _binary_encoder(pg_type: str, encoding: str):
+    """
+    Return a value -> bytes encoder for a COPY BINARY field, None if unsupported.
+    
+    Values are not cast to the column type: an encoder raises TypeError
+    (struct.error when out of range) for a value whose type does not
+    match, e.g. 12.5 or True for an integer column, or 'False' for a boolean.
+    """
+    if pg_type in ('int2', 'int4', 'int8'):
+        pack = struct.Struct({'int2': '>h', 'int4': '>i', 'int8': '>q'}[pg_type]).pack
+        
+        def encode(value):
+            # Integral floats come from int columns widened by missing values
+            if isinstance(value, float) and value.is_integer():
+                value = int(value)
+            if type(value) is not int:
+                raise TypeError(f"{value!r} is not a valid {pg_type}")
+            return pack(value)
+        return encode
+    if pg_type in ('float4', 'float8'):
+        pack = struct.Struct('>f' if pg_type == 'float4' else '>d').pack
+        
+        def encode(value):
+            if type(value) not in (int, float):
+                raise TypeError(f"{value!r} is not a valid {pg_type}")
+            return pack(value)
+        return encode
+    if pg_type == 'bool':
+        pack = struct.Struct('>?').pack
+        
+        def encode(value):
+            if type(value) is not bool:
+                raise TypeError(f"{value!r} is not a valid {pg_type}")
+            return pack(value)
+        return encode
+    if pg_type in ('text', 'varchar', 'bpchar'):
+        return lambda value: str(value).encode(encoding)
+    if pg_type == 'geometry':
+        # geometry_recv takes EWKB as-is
+        return bytes
+    return None
+
+
+def _copy_gdf_binary(cur, gdf: gpd.GeoDataFrame, table: str, schema: str,
+                     srid: int, cols: list, encoders: list,
+                     geom_col: str = 'geometry') -> int:
+    """
+    Bulk load a GeoDataFrame through COPY FROM STDIN (binary format).
+    
+    Geometries are sent as raw EWKB bytes, half the size of hex text and
+    with no hex parsing on the server. Attributes are packed by the
+    encoders matching their target column types (see _binary_encoder).
+    
+    Returns:
+        Number of rows sent to the server
+    """
+    buf = io.BytesIO()
+    buf.write(_PGCOPY_HEADER)
+    field_count = struct.pack('>h', len(encoders))
+    int32 = struct.Struct('>i').pack
+    rows = _prepare_rows(gdf, cols, geom_col, srid, hex=False)
+    
+    for row in rows:
+        buf.write(field_count)
+        for encode, value in zip(encoders, row):
+            if pd.isna(value):
+                buf.write(_PGCOPY_NULL)
+            else:
+                data = encode(value)
+                buf.write(int32(len(data)))
+                buf.write(data)
+                
+    buf.write(_PGCOPY_TRAILER)
+    buf.seek(0)
+    cur.copy_expert(
+        sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT BINARY)").format(
+            sql.Identifier(schema, table),
+            sql.SQL(', ').join(map(sql.Identifier, cols + ['geom']))),
+        buf
+    )
+    return len(rows)
+
+
+def _copy_into(cur, gdf: gpd.GeoDataFrame, table: str, schema: str,
+               srid: int, cols: list, geom_col: str = 'geometry') -> int:
+    """COPY a GeoDataFrame into a table, in binary format when every target column type allows it."""
+    column_types = _get_column_types(cur, table, schema)
+    encoding = psycopg2.extensions.encodings[cur.connection.encoding]
+    encoders = [_binary_encoder(column_types.get(col), encoding) for col in cols + ['geom']]
+    
+    if all(encoders):
+        try:
+            return _copy_gdf_binary(cur, gdf, table, schema, srid, cols, encoders, geom_col)
+        except (TypeError, struct.error) as e:
+            # Nothing was sent yet: let the server parse (or reject) the
+            # values as text, exactly as a CSV COPY would
+            logger.info("Binary COPY not possible (%s), falling back to CSV", e)
+    return _copy_gdf(cur, gdf, table, schema, srid, cols, geom_col)
+
+
+def _insert_rows_one_by_one(cur, insert_sql: sql.Composable, rows: list, template: str) -> int:
+    """
+    Insert rows individually, each behind a savepoint, skipping those PostGIS rejects.
+    
+    Returns:
+        Number of rows inserted
+    """
+    inserted = 0
+    for row in rows:
+        cur.execute("SAVEPOINT upsert_row;")
+        try:
+            execute_values(cur, insert_sql, [row], template=template)
+            inserted += 1
+        except psycopg2.Error as e:
+            cur.execute("ROLLBACK TO SAVEPOINT upsert_row;")
+            logger.error("Skipping row: %s", e)
+        cur.execute("RELEASE SAVEPOINT upsert_row;")
+        
+    if inserted < len(rows):
+        logger.warning("%s of %s rows rejected", len(rows) - inserted, len(rows))
+    return inserted
+
+
+def _copy_shard(gdf: gpd.GeoDataFrame, table: str, schema: str,
+                srid: int, cols: list, geom_col: str = 'geometry') -> int:
+    """COPY one shard on its own pooled connection and commit it."""
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            count = _copy_into(cur, gdf, table, schema, srid, cols, geom_col)
+        conn.commit()
+    return count
+
+
+def _copy_parallel(gdf: gpd.GeoDataFrame, table: str, schema: str, srid: int,
+                   cols: list, geom_col: str = 'geometry', workers: int = 4) -> int:
+    """
+    COPY a GeoDataFrame as row-range shards on concurrent pooled connections.
+    
+    psycopg2 releases the GIL while libpq sends data, so the shards are
+    serialised and streamed in parallel threads. Each shard is committed
+    on its own; the caller's connection keeps one slot of the pool.
+    
+    Returns:
+        Number of rows sent to the server
+    """
+    workers = max(1, min(workers, _POOL_MAXCONN - 1, len(gdf)))
+    shards = [gdf.iloc[idx] for idx in np.array_split(np.arange(len(gdf)), workers)]
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_copy_shard, shard, table, schema, srid, cols, geom_col)
+            for shard in shards
+        ]
+        return sum(future.result() for future in futures)
 
 
 def upsert_dataframe_to_postgis(gdf: gpd.GeoDataFrame, table_name: str,
                                geom_col: str = 'geometry', srid: int = 2154,
-                               schema: str = 'public', mode: str = 'append') -> None:
+                               schema: str = 'public', mode: str = 'append',
+                               source_srid: Optional[int] = None,
+                               unlogged: bool = False,
+                               workers: int = 1) -> None:
     """
     Insert ou met à jour les données GeoDataFrame dans PostGIS.
     
     Gère automatiquement :
     - Création de la table si elle n'existe pas
-    - Conversion des géométries en WKB hexadécimal
-    - Insertion par batch avec gestion d'erreurs
-    - Création d'index spatial GIST
+    - Conversion vectorisée des géométries en EWKB hexadécimal
+    - Chargement par COPY FROM STDIN (binaire si possible) quand la table cible est vide,
+      réparti sur plusieurs connexions si workers > 1
+    - Insertion par batch en mode append, une savepoint par lot : un lot en
+      échec est rejoué ligne à ligne et seules les lignes fautives sont ignorées
+    - Reprojection côté serveur (ST_Transform) si source_srid diffère de srid
+    - Création d'index spatial GIST après chargement (table créée)
+    - En mode 'replace', index secondaires supprimés avant le chargement
+      et reconstruits après
     
     Args:
         gdf: GeoDataFrame à insérer
@@ -160,6 +534,13 @@ def upsert_dataframe_to_postgis(gdf: gpd.GeoDataFrame, table_name: str,
         srid: Système de référence spatial (défaut: 2154 pour Lambert-93)
         schema: Schéma PostgreSQL (défaut: 'public')
         mode: Mode d'insertion ('append', 'replace')
+        source_srid: SRID des géométries du GeoDataFrame si elles ne sont
+            pas encore dans ``srid`` ; PostGIS se charge alors de la reprojection
+        unlogged: Crée la table en UNLOGGED si elle n'existe pas (pas de WAL
+            pendant le chargement) ; elle repasse en LOGGED une fois chargée
+        workers: Nombre de connexions COPY concurrentes pour une table cible
+            vide (borné par la taille du pool). Chaque lot est validé
+            séparément : un échec peut laisser un chargement partiel
         
     Modes:
         - 'append': Ajoute à la table existante
@@ -173,77 +554,116 @@ def upsert_dataframe_to_postgis(gdf: gpd.GeoDataFrame, table_name: str,
         logger.warning("Empty GeoDataFrame, nothing to insert")
         return
         
-    # Create table if it doesn't exist
-    if not table_exists(table_name, schema):
-        create_table_from_gdf(gdf, table_name, geom_col, srid, schema)
-    elif mode == 'replace':
-        execute_query(f"TRUNCATE TABLE {schema}.{table_name} RESTART IDENTITY;")
-        
+    created = not table_exists(table_name, schema)
+    
     with get_db_connection() as conn:
         with conn.cursor() as cur:
+            # Table creation, load and index build share one transaction
+            dropped_indexes = []
+            if created:
+                _create_table(cur, gdf, table_name, geom_col, srid, schema, unlogged)
+                logger.info("Table %s.%s created successfully", schema, table_name)
+            elif mode == 'replace':
+                cur.execute(sql.SQL("TRUNCATE TABLE {} RESTART IDENTITY;").format(
+                    sql.Identifier(schema, table_name)))
+                # Rebuilt once after the load instead of maintained row by row
+                dropped_indexes = _drop_indexes(cur, table_name, schema)
+            target_is_empty = created or mode == 'replace'
+            
             # Prepare data for insertion
             columns = [col for col in gdf.columns if col != geom_col]
+            table = sql.Identifier(schema, table_name)
+            quoted = [sql.Identifier(col) for col in columns]
+            col_names = sql.SQL(', ').join(quoted + [sql.Identifier('geom')])
             
-            # Build INSERT statement
-            col_names = ', '.join([f'"{col}"' for col in columns] + ['geom'])
-            placeholders = ', '.join(['%s'] * (len(columns) + 1))
-            insert_sql = f"""
-                INSERT INTO {schema}.{table_name} ({col_names})
-                VALUES ({placeholders})
-            """
-            
-            # Prepare data rows
-            rows = []
-            for _, row in gdf.iterrows():
-                values = [row[col] for col in columns]
+            # Reprojection on the server: COPY the rows in their source SRID
+            # into a temporary staging table, then INSERT ... SELECT ST_Transform
+            reproject = source_srid is not None and source_srid != srid
+            if reproject:
+                staging = f"{table_name}_staging"
+                cur.execute(sql.SQL("""
+                    CREATE TEMP TABLE {staging} ON COMMIT DROP AS
+                    SELECT {columns}
+                    FROM {table}
+                    LIMIT 0;
+                """).format(
+                    staging=sql.Identifier(staging),
+                    columns=sql.SQL(', ').join(quoted + [sql.SQL('geom::geometry AS geom')]),
+                    table=table
+                ))
+                count = _copy_into(cur, gdf, staging, 'pg_temp', source_srid, columns, geom_col)
                 
-                # Convert geometry to WKB hex
-                geom = row[geom_col]
-                if geom is not None and not geom.is_empty:
-                    wkb_hex = geom.wkb_hex
-                    values.append(f"SRID={srid};{wkb_hex}")
-                else:
-                    values.append(None)
-                    
-                rows.append(values)
-            
-            # Batch insert
-            for row in rows:
+                cur.execute(sql.SQL("""
+                    INSERT INTO {table} ({col_names})
+                    SELECT {select_cols} FROM {staging}
+                    {on_conflict};
+                """).format(
+                    table=table,
+                    col_names=col_names,
+                    select_cols=sql.SQL(', ').join(
+                        quoted + [sql.SQL('ST_Transform(geom, {})').format(sql.Literal(int(srid)))]),
+                    staging=sql.Identifier(staging),
+                    on_conflict=sql.SQL('' if target_is_empty else 'ON CONFLICT DO NOTHING')
+                ))
+                logger.info("Reprojected %s rows from EPSG:%s to EPSG:%s", count, source_srid, srid)
+                
+            # Empty target with several workers: the DDL/TRUNCATE must be
+            # committed (and its lock released) before the shards can COPY
+            elif target_is_empty and workers > 1:
+                conn.commit()
                 try:
-                    # Handle geometry column specially
-                    geom_value = row[-1]
-                    if geom_value:
-                        # Use ST_GeomFromEWKT for geometry with SRID
-                        sql_with_geom = insert_sql.replace('%s', '%s', len(row)-1) + " ON CONFLICT DO NOTHING"
-                        sql_with_geom = sql_with_geom.replace(
-                            f"({'%s, ' * (len(row)-1)}%s)",
-                            f"({'%s, ' * (len(row)-1)}ST_GeomFromEWKT(%s))"
-                        )
-                        cur.execute(sql_with_geom, row[:-1] + [geom_value])
-                    else:
-                        cur.execute(insert_sql + " ON CONFLICT DO NOTHING", row)
-                except Exception as e:
-                    logger.error(f"Error inserting row: {e}")
-                    conn.rollback()
-                    # Try simpler insertion
+                    count = _copy_parallel(gdf, table_name, schema, srid, columns, geom_col, workers)
+                except Exception:
+                    # The DROP INDEX / CREATE TABLE is committed too: leave the
+                    # table indexed and logged before propagating the failure
+                    _restore_indexes(cur, dropped_indexes)
+                    if created and unlogged:
+                        _set_logged(cur, table_name, schema)
+                    conn.commit()
+                    raise
+                
+            # Empty target: nothing can conflict, stream everything with COPY
+            elif target_is_empty:
+                count = _copy_into(cur, gdf, table_name, schema, srid, columns, geom_col)
+                
+            else:
+                # Build INSERT statement, execute_values expands VALUES %s per page
+                insert_sql = sql.SQL("""
+                    INSERT INTO {table} ({col_names})
+                    VALUES %s
+                    ON CONFLICT DO NOTHING
+                """).format(table=table, col_names=col_names)
+                # geometry_in parses EWKB hex, ST_GeomFromEWKT only parses WKT
+                template = '(' + ', '.join(['%s'] * len(columns) + ['%s::geometry']) + ')'
+                
+                rows = _prepare_rows(gdf, columns, geom_col, srid)
+                
+                # Batch insert: one round-trip per page of 1000 rows, each
+                # behind a savepoint so a failing page is rolled back alone
+                count = 0
+                for start in range(0, len(rows), _PAGE_SIZE):
+                    page = rows[start:start + _PAGE_SIZE]
+                    cur.execute("SAVEPOINT upsert_page;")
                     try:
-                        conn.commit()
-                        for col_val in row[:-1]:
-                            if col_val is None:
-                                col_val = ''
-                        simple_sql = f"""
-                            INSERT INTO {schema}.{table_name} ({col_names})
-                            VALUES ({', '.join(['%s'] * (len(columns)))}, ST_GeomFromEWKT(%s))
-                            ON CONFLICT DO NOTHING
-                        """
-                        cur.execute(simple_sql, row)
-                        conn.commit()
-                    except:
-                        conn.rollback()
-                        continue
-                    
+                        execute_values(cur, insert_sql, page, template=template, page_size=_PAGE_SIZE)
+                        count += len(page)
+                    except psycopg2.Error as e:
+                        cur.execute("ROLLBACK TO SAVEPOINT upsert_page;")
+                        logger.warning("Rows %s-%s failed (%s), retrying row by row", start, start + len(page) - 1, e)
+                        count += _insert_rows_one_by_one(cur, insert_sql, page, template)
+                    cur.execute("RELEASE SAVEPOINT upsert_page;")
+                
+            # Index a freshly created (or emptied) table only once its rows are in
+            _restore_indexes(cur, dropped_indexes)
+            if created:
+                # SET LOGGED rewrites the table and its indexes: switch it
+                # before building the GiST index so the index is built once
+                if unlogged:
+                    _set_logged(cur, table_name, schema)
+                _create_gist_index(cur, table_name, schema)
+                
             conn.commit()
-            logger.info(f"Successfully inserted {len(rows)} rows into {schema}.{table_name}")
+            logger.info("Successfully inserted %s rows into %s.%s", count, schema, table_name)
 
 
 def read_postgis_to_gdf(query: str, geom_col: str = 'geom') -> gpd.GeoDataFrame:
@@ -254,8 +674,10 @@ def read_postgis_to_gdf(query: str, geom_col: str = 'geom') -> gpd.GeoDataFrame:
         df = pd.read_sql(query, conn)
         
         if geom_col in df.columns and len(df) > 0:
-            # Convert WKB to shapely geometries
-            df[geom_col] = df[geom_col].apply(lambda x: wkb.loads(x, hex=True) if x else None)
+            # Decode the EWKB hex sent by PostGIS in one vectorised call
+            values = df[geom_col].to_numpy(dtype=object)
+            values[pd.isna(values)] = None
+            df[geom_col] = shapely.from_wkb(values)
             
             # Convert to GeoDataFrame
             gdf = gpd.GeoDataFrame(df, geometry=geom_col, crs='EPSG:2154')
@@ -264,6 +686,35 @@ def read_postgis_to_gdf(query: str, geom_col: str = 'geom') -> gpd.GeoDataFrame:
             return gpd.GeoDataFrame(df, crs='EPSG:2154')
 
 
+def export_query_to_csv(query: Union[str, sql.Composable], params: Optional[tuple] = None,
+                        output_path: Union[str, os.PathLike] = 'query_result.csv') -> int:
+    """
+    Stream a query result to a CSV file (with header) through COPY (...) TO STDOUT.
+    
+    Rows go from the server to the file without being materialised as
+    Python objects.
+    
+    Returns:
+        Number of rows exported
+    """
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            if isinstance(query, sql.Composable):
+                query = query.as_string(conn)
+                
+            # COPY accepts no bind parameters: inline them client-side
+            select = cur.mogrify(query.strip().rstrip(';'), params)
+            select = select.decode(psycopg2.extensions.encodings[conn.encoding])
+            
+            with open(output_path, 'wb') as f:
+                cur.copy_expert(f"COPY ({select}) TO STDOUT WITH (FORMAT CSV, HEADER)", f)
+            count = cur.rowcount
+        conn.commit()
+        
+    logger.info("Exported %s rows to %s", count, output_path)
+    return count
+
+
 def get_table_srid(table_name: str, geom_col: str = 'geom', schema: str = 'public') -> Optional[int]:
     """Get SRID of geometry column in a PostGIS table."""
     query = """
@@ -2,10 +2,10 @@
 
 import logging
 from typing import Optional, Union
+import numpy as np
 import geopandas as gpd
+import shapely
 from shapely.geometry import Polygon, MultiPolygon, LineString, MultiLineString, Point, MultiPoint
-from shapely.ops import unary_union
-from shapely.validation import make_valid
 import warnings
 
 warnings.filterwarnings('ignore', category=FutureWarning)
@@ -37,14 +37,17 @@ def ensure_crs(gdf: gpd.GeoDataFrame, target_epsg: int = 2154) -> gpd.GeoDataFra
         - 4326: WGS84 (GPS, à éviter pour calculs)
         - 27572: Lambert II étendu (ancien)
     """
+    # EPSG codes are compared as integers, resolved once
+    current_epsg = gdf.crs.to_epsg() if gdf.crs is not None else None
+    
     if gdf.crs is None:
-        logger.warning(f"No CRS detected, setting to EPSG:{target_epsg}")
-        gdf = gdf.set_crs(f"EPSG:{target_epsg}")
-    elif gdf.crs.to_epsg() != target_epsg:
-        logger.info(f"Reprojecting from EPSG:{gdf.crs.to_epsg()} to EPSG:{target_epsg}")
-        gdf = gdf.to_crs(f"EPSG:{target_epsg}")
+        logger.warning("No CRS detected, setting to EPSG:%s", target_epsg)
+        gdf = gdf.set_crs(target_epsg)
+    elif current_epsg != target_epsg:
+        logger.info("Reprojecting from EPSG:%s to EPSG:%s", current_epsg, target_epsg)
+        gdf = gdf.to_crs(target_epsg)
     else:
-        logger.info(f"CRS already set to EPSG:{target_epsg}")
+        logger.info("CRS already set to EPSG:%s", target_epsg)
         
     return gdf
 
@@ -79,6 +82,34 @@ def to_multi_geometry(geom: Union[Polygon, LineString, Point,
         return geom
 
 
+def to_multi_geometries(geoms) -> np.ndarray:
+    """
+    Vectorised version of to_multi_geometry over an array of geometries.
+    
+    Single geometries are promoted with one shapely constructor call per
+    geometry type instead of one Python call per geometry.
+    
+    Args:
+        geoms: Array-like of geometries (GeometryArray, GeoSeries, ndarray)
+        
+    Returns:
+        Object ndarray of multi-geometries (None for null/empty input)
+    """
+    geoms = np.array(geoms, dtype=object)
+    type_ids = shapely.get_type_id(geoms)
+    
+    # Point=0, LineString=1, Polygon=3; other types are left untouched
+    for type_id, constructor in ((0, shapely.multipoints),
+                                 (1, shapely.multilinestrings),
+                                 (3, shapely.multipolygons)):
+        mask = type_ids == type_id
+        if mask.any():
+            geoms[mask] = constructor(geoms[mask].reshape(-1, 1))
+            
+    geoms[shapely.is_empty(geoms)] = None
+    return geoms
+
+
 def normalize_geometry(gdf: gpd.GeoDataFrame, 
                       force_multi: bool = True,
                       simplify_tolerance: Optional[float] = None,
@@ -95,53 +126,72 @@ def normalize_geometry(gdf: gpd.GeoDataFrame,
     Returns:
         GeoDataFrame with normalized geometries
     """
-    gdf = gdf.copy()
+    geom_col = gdf.geometry.name
+    original = geoms = gdf.geometry
     
     # Fix invalid geometries
     if fix_invalid:
         logger.info("Checking and fixing invalid geometries...")
-        invalid_count = (~gdf.geometry.is_valid).sum()
+        # Validity is evaluated once; repairs are re-checked on that subset only
+        invalid = ~shapely.is_valid(geoms.array) & ~shapely.is_missing(geoms.array)
+        invalid_count = invalid.sum()
         
         if invalid_count > 0:
-            logger.warning(f"Found {invalid_count} invalid geometries, attempting to fix...")
+            logger.warning("Found %s invalid geometries, attempting to fix...", invalid_count)
+            
+            # Repair in place on a private copy of the geometry ndarray,
+            # one shapely call per step over the invalid subset
+            fixed = np.array(geoms.array, dtype=object)
             
-            # Try buffer(0) first
-            gdf.geometry = gdf.geometry.buffer(0)
+            # Try buffer(0) first, on the invalid geometries only
+            fixed[invalid] = shapely.buffer(fixed[invalid], 0)
             
             # For remaining invalid, use make_valid
-            still_invalid = ~gdf.geometry.is_valid
+            still_invalid = invalid.copy()
+            still_invalid[invalid] = ~shapely.is_valid(fixed[invalid])
             if still_invalid.any():
-                gdf.loc[still_invalid, 'geometry'] = gdf.loc[still_invalid, 'geometry'].apply(make_valid)
+                fixed[still_invalid] = shapely.make_valid(fixed[still_invalid])
                 
-            final_invalid = (~gdf.geometry.is_valid).sum()
+            geoms = gpd.GeoSeries(fixed, index=geoms.index, crs=geoms.crs)
+            final_invalid = (~shapely.is_valid(fixed[still_invalid])).sum()
             if final_invalid > 0:
-                logger.error(f"Could not fix {final_invalid} geometries")
+                logger.error("Could not fix %s geometries", final_invalid)
             else:
                 logger.info("All invalid geometries fixed")
     
     # Convert to multi-geometries
     if force_multi:
         logger.info("Converting to multi-geometries...")
-        gdf.geometry = gdf.geometry.apply(to_multi_geometry)
+        geoms = gpd.GeoSeries(to_multi_geometries(geoms.array),
+                              index=geoms.index, crs=geoms.crs)
     
     # Simplify if requested
     if simplify_tolerance:
-        logger.info(f"Simplifying geometries with tolerance {simplify_tolerance}...")
-        gdf.geometry = gdf.geometry.simplify(simplify_tolerance, preserve_topology=True)
+        logger.info("Simplifying geometries with tolerance %s...", simplify_tolerance)
+        geoms = geoms.simplify(simplify_tolerance, preserve_topology=True)
     
-    # Remove empty geometries
-    empty_count = gdf.geometry.is_empty.sum()
-    if empty_count > 0:
-        logger.warning(f"Removing {empty_count} empty geometries")
-        gdf = gdf[~gdf.geometry.is_empty]
+    # Only rebind the geometry column when a step rewrote it; the shallow
+    # copy shares the attribute columns with the input frame
+    if geoms is not original:
+        gdf = gdf.copy(deep=False)
+        gdf[geom_col] = geoms
     
-    # Remove None geometries
-    none_count = gdf.geometry.isna().sum()
+    # Remove empty and None geometries with a single mask and row filter
+    empty = shapely.is_empty(gdf.geometry.array)
+    missing = shapely.is_missing(gdf.geometry.array)
+    
+    empty_count = empty.sum()
+    if empty_count > 0:
+        logger.warning("Removing %s empty geometries", empty_count)
+        
+    none_count = missing.sum()
     if none_count > 0:
-        logger.warning(f"Removing {none_count} null geometries")
-        gdf = gdf[gdf.geometry.notna()]
+        logger.warning("Removing %s null geometries", none_count)
+        
+    if empty_count > 0 or none_count > 0:
+        gdf = gdf[~(empty | missing)]
     
-    logger.info(f"Geometry normalization complete: {len(gdf)} valid features")
+    logger.info("Geometry normalization complete: %s valid features", len(gdf))
     return gdf
 
 
@@ -202,13 +252,23 @@ def clip_by_bounds(gdf: gpd.GeoDataFrame,
     
     bbox = box(minx, miny, maxx, maxy)
     
-    # Ensure same CRS for clipping
-    bbox_gdf = gpd.GeoDataFrame([1], geometry=[bbox], crs=gdf.crs)
+    # Candidate features from the spatial index (bbox tree query)
+    idx = np.sort(gdf.sindex.query(bbox, predicate='intersects'))
+    candidates = gdf.iloc[idx]
+    
+    # Features whose envelope lies inside the box are kept verbatim; only
+    # those straddling its boundary pay for an exact intersection
+    geoms = np.array(candidates.geometry.array, dtype=object)
+    bounds = shapely.bounds(geoms)
+    straddling = ~((bounds[:, 0] >= minx) & (bounds[:, 1] >= miny) &
+                   (bounds[:, 2] <= maxx) & (bounds[:, 3] <= maxy))
+    geoms[straddling] = shapely.intersection(geoms[straddling], bbox)
     
-    # Perform clip
-    clipped = gpd.clip(gdf, bbox_gdf)
+    clipped = candidates.copy(deep=False)
+    clipped[candidates.geometry.name] = geoms
+    clipped = clipped[~shapely.is_empty(geoms)]
     
-    logger.info(f"Clipped {len(gdf)} features to {len(clipped)} features within bounds")
+    logger.info("Clipped %s features to %s features within bounds", len(gdf), len(clipped))
     return clipped
 
 
@@ -229,12 +289,20 @@ def dissolve_by_attribute(gdf: gpd.GeoDataFrame,
     if attribute not in gdf.columns:
         raise ValueError(f"Attribute '{attribute}' not found in GeoDataFrame")
     
-    logger.info(f"Dissolving by '{attribute}'...")
+    logger.info("Dissolving by '%s'...", attribute)
     
-    if aggfunc:
-        dissolved = gdf.dissolve(by=attribute, aggfunc=aggfunc)
-    else:
-        dissolved = gdf.dissolve(by=attribute)
+    # Aggregate attributes in one groupby, then union each group's geometry
+    # sub-array directly instead of going through groupby-apply
+    geom_name = gdf.geometry.name
+    grouped = gdf.drop(columns=geom_name).groupby(attribute)
+    data = grouped.agg(aggfunc or 'first')
+    
+    geoms = np.asarray(gdf.geometry.array)
+    indices = grouped.indices
+    unions = [shapely.union_all(geoms[indices[key]]) for key in data.index]
+    
+    data.insert(0, geom_name, gpd.GeoSeries(unions, index=data.index))
+    dissolved = gpd.GeoDataFrame(data, geometry=geom_name, crs=gdf.crs)
     
-    logger.info(f"Dissolved {len(gdf)} features to {len(dissolved)} features")
+    logger.info("Dissolved %s features to %s features", len(gdf), len(dissolved))
     return dissolved
\ No newline at end of file
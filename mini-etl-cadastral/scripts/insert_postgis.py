@@ -1,9 +1,14 @@
 """Module for inserting spatial data into PostGIS."""
 
+import os
+import shutil
 import logging
-from typing import Optional
+import subprocess
+from pathlib import Path
+from typing import Optional, Union
 import geopandas as gpd
-from db_utils import upsert_dataframe_to_postgis, table_exists, execute_query
+from psycopg2 import sql
+from db_utils import upsert_dataframe_to_postgis, table_exists, execute_query, get_db_config
 from geometry_utils import normalize_geometry, ensure_crs
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -15,7 +20,11 @@ def insert_geodataframe(gdf: gpd.GeoDataFrame,
                         srid: int = 2154,
                         schema: str = 'public',
                         mode: str = 'append',
-                        normalize: bool = True) -> bool:
+                        normalize: bool = True,
+                        reproject_on_server: bool = False,
+                        source_path: Optional[Union[str, Path]] = None,
+                        workers: int = 1,
+                        analyze: bool = True) -> bool:
     """
     Insert GeoDataFrame into PostGIS table.
     
@@ -26,6 +35,18 @@ def insert_geodataframe(gdf: gpd.GeoDataFrame,
         schema: Database schema (default 'public')
         mode: Insert mode ('append', 'replace', 'fail')
         normalize: Whether to normalize geometries before insertion
+        reproject_on_server: Upload geometries in their source CRS and let
+            PostGIS reproject them (ST_Transform) instead of GeoPandas
+        source_path: File the GeoDataFrame was read from, unmodified. When
+            given and ogr2ogr is installed, GDAL loads the file directly
+            (COPY mode); the Python path below is the fallback. A table
+            created by ogr2ogr differs from one created by GeoPandas: it
+            gets an ``ogc_fid`` key, and is neither created UNLOGGED nor
+            loaded with its indexes dropped
+        workers: Number of concurrent COPY connections used to load an
+            empty or replaced table
+        analyze: ANALYZE the table after the load (False when the caller
+            runs VACUUM ANALYZE itself)
         
     Returns:
         True if successful, False otherwise
@@ -35,67 +56,150 @@ def insert_geodataframe(gdf: gpd.GeoDataFrame,
             logger.warning("Empty GeoDataFrame provided, nothing to insert")
             return False
             
-        # Ensure correct CRS
-        gdf = ensure_crs(gdf, srid)
-        
-        # Normalize geometries if requested
-        if normalize:
-            gdf = normalize_geometry(gdf)
-            
         # Check if table exists and handle mode
-        if table_exists(table_name, schema):
+        exists = table_exists(table_name, schema)
+        if exists:
             if mode == 'fail':
-                logger.error(f"Table {schema}.{table_name} already exists and mode is 'fail'")
+                logger.error("Table %s.%s already exists and mode is 'fail'", schema, table_name)
                 return False
             elif mode == 'replace':
-                logger.info(f"Replacing existing data in {schema}.{table_name}")
+                logger.info("Replacing existing data in %s.%s", schema, table_name)
             else:  # append
-                logger.info(f"Appending to existing table {schema}.{table_name}")
+                logger.info("Appending to existing table %s.%s", schema, table_name)
         else:
-            logger.info(f"Creating new table {schema}.{table_name}")
+            logger.info("Creating new table %s.%s", schema, table_name)
+            
+        # Fast path: GDAL streams the source file straight into PostGIS
+        if source_path and _load_with_ogr2ogr(source_path, table_name, srid, schema, mode):
+            update_table_statistics(table_name, schema, analyze=analyze)
+            logger.info("Successfully loaded %s into %s.%s with ogr2ogr", source_path, schema, table_name)
+            return True
+            
+        # Ensure correct CRS, or leave the reprojection to PostGIS
+        source_srid = None
+        if reproject_on_server and gdf.crs is not None:
+            source_srid = gdf.crs.to_epsg()
+            
+        if source_srid is None:
+            gdf = ensure_crs(gdf, srid)
+        elif source_srid != srid:
+            logger.info("Reprojecting from EPSG:%s to EPSG:%s on the server", source_srid, srid)
+        
+        # Normalize geometries if requested
+        if normalize:
+            gdf = normalize_geometry(gdf)
             
-        # Insert data
+        # Insert data; a new table is loaded UNLOGGED (no WAL) and switched
+        # to LOGGED by the upsert once its rows are in
         upsert_dataframe_to_postgis(
             gdf=gdf,
             table_name=table_name,
             geom_col='geometry',
             srid=srid,
             schema=schema,
-            mode=mode
+            mode=mode,
+            source_srid=source_srid,
+            unlogged=not exists,
+            workers=workers
         )
         
-        # Update statistics
-        update_table_statistics(table_name, schema)
+        # Update statistics; a new table was already analyzed with its GiST build
+        update_table_statistics(table_name, schema, analyze=analyze and exists)
         
-        logger.info(f"Successfully inserted {len(gdf)} features into {schema}.{table_name}")
+        logger.info("Successfully inserted %s features into %s.%s", len(gdf), schema, table_name)
         return True
         
     except Exception as e:
-        logger.error(f"Error inserting data: {e}")
+        logger.error("Error inserting data: %s", e)
+        return False
+
+
+def _load_with_ogr2ogr(source_path: Union[str, Path],
+                       table_name: str,
+                       srid: int = 2154,
+                       schema: str = 'public',
+                       mode: str = 'append') -> bool:
+    """
+    Load a vector file into PostGIS with ogr2ogr, bypassing GeoPandas.
+    
+    GDAL reprojects, promotes to multi-geometries, repairs invalid
+    geometries and streams rows with COPY (PG_USE_COPY) in one C process.
+    The whole file goes in a single transaction (-gt unlimited), so a
+    failed run leaves nothing behind for the GeoPandas fallback to duplicate.
+    
+    Args:
+        source_path: Vector file to load (shapefile, GeoPackage...)
+        table_name: Target table name
+        srid: Target SRID
+        schema: Database schema
+        mode: Insert mode ('append', 'replace')
+        
+    Returns:
+        True if ogr2ogr loaded the file, False if it is missing or failed
+    """
+    ogr2ogr = shutil.which('ogr2ogr')
+    if not ogr2ogr:
+        logger.info("ogr2ogr not found, using the GeoPandas loader")
         return False
+        
+    config = get_db_config()
+    dsn = (f"PG:host={config['host']} port={config['port']} "
+           f"dbname={config['database']} user={config['user']}")
+    
+    # Keep the password off the command line
+    env = dict(os.environ, PGPASSWORD=config['password'])
+    
+    if mode == 'replace' and table_exists(table_name, schema):
+        execute_query(sql.SQL("TRUNCATE TABLE {} RESTART IDENTITY;").format(
+            sql.Identifier(schema, table_name)))
+        
+    cmd = [
+        ogr2ogr, '-f', 'PostgreSQL', dsn, str(source_path),
+        '-nln', f"{schema}.{table_name}",
+        '-append',
+        '-gt', 'unlimited',
+        '-t_srs', f"EPSG:{srid}",
+        '-nlt', 'PROMOTE_TO_MULTI',
+        '-makevalid',
+        '-lco', 'GEOMETRY_NAME=geom',
+        # Keep the table and column names as given, like the quoted DDL
+        '-lco', 'LAUNDER=NO',
+        '-lco', 'SPATIAL_INDEX=GIST',
+        '--config', 'PG_USE_COPY', 'YES'
+    ]
+    
+    result = subprocess.run(cmd, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        logger.warning("ogr2ogr failed, using the GeoPandas loader: %s", result.stderr.strip())
+        return False
+        
+    return True
 
 
-def update_table_statistics(table_name: str, schema: str = 'public') -> None:
+def update_table_statistics(table_name: str, schema: str = 'public',
+                            analyze: bool = True) -> None:
     """
     Update PostGIS table statistics for query optimization.
     
     Args:
         table_name: Table name
         schema: Database schema
+        analyze: Run ANALYZE (skip it when the table was just analyzed)
     """
     try:
         # Analyze table for query planner
-        execute_query(f"ANALYZE {schema}.{table_name};")
+        if analyze:
+            execute_query(sql.SQL("ANALYZE {};").format(sql.Identifier(schema, table_name)))
         
         # Update geometry statistics
-        execute_query(f"""
-            SELECT Populate_Geometry_Columns('{schema}.{table_name}'::regclass);
-        """)
+        execute_query("""
+            SELECT Populate_Geometry_Columns(format('%%I.%%I', %s, %s)::regclass);
+        """, (schema, table_name))
         
-        logger.info(f"Updated statistics for {schema}.{table_name}")
+        logger.info("Updated statistics for %s.%s", schema, table_name)
         
     except Exception as e:
-        logger.warning(f"Could not update statistics: {e}")
+        logger.warning("Could not update statistics: %s", e)
 
 
 def validate_insertion(table_name: str, 
@@ -114,24 +218,52 @@ def validate_insertion(table_name: str,
     """
     try:
         result = execute_query(
-            f"SELECT COUNT(*) as count FROM {schema}.{table_name};",
+            sql.SQL("SELECT COUNT(*) as count FROM {};").format(sql.Identifier(schema, table_name)),
             fetch=True
         )
         
         actual_count = result[0]['count'] if result else 0
         
         if actual_count >= expected_count:
-            logger.info(f"Validation passed: {actual_count} rows in {schema}.{table_name}")
+            logger.info("Validation passed: %s rows in %s.%s", actual_count, schema, table_name)
             return True
         else:
-            logger.warning(f"Validation warning: Expected at least {expected_count} rows, found {actual_count}")
+            logger.warning("Validation warning: Expected at least %s rows, found %s", expected_count, actual_count)
             return False
             
     except Exception as e:
-        logger.error(f"Validation error: {e}")
+        logger.error("Validation error: %s", e)
         return False
 
 
+def create_attribute_index(table_name: str,
+                           column: str,
+                           schema: str = 'public') -> None:
+    """
+    Create a B-tree index on an attribute column if it does not exist yet.
+    
+    Args:
+        table_name: Table name
+        column: Column to index
+        schema: Database schema
+    """
+    try:
+        index_name = f"{table_name}_{column}_idx"
+        execute_query(sql.SQL("""
+            CREATE INDEX IF NOT EXISTS {index} 
+            ON {table} ({column});
+        """).format(
+            index=sql.Identifier(index_name),
+            table=sql.Identifier(schema, table_name),
+            column=sql.Identifier(column)
+        ))
+        
+        logger.info("Created attribute index %s", index_name)
+        
+    except Exception as e:
+        logger.error("Error creating attribute index: %s", e)
+
+
 def create_spatial_index(table_name: str, 
                         geom_col: str = 'geom',
                         schema: str = 'public') -> None:
@@ -147,16 +279,20 @@ def create_spatial_index(table_name: str,
         index_name = f"{table_name}_{geom_col}_gist"
         
         # Drop if exists
-        execute_query(f"DROP INDEX IF EXISTS {schema}.{index_name};")
+        execute_query(sql.SQL("DROP INDEX IF EXISTS {};").format(sql.Identifier(schema, index_name)))
         
         # Create new index
-        execute_query(f"""
-            CREATE INDEX {index_name} 
-            ON {schema}.{table_name} 
+        execute_query(sql.SQL("""
+            CREATE INDEX {index} 
+            ON {table} 
             USING GIST ({geom_col});
-        """)
+        """).format(
+            index=sql.Identifier(index_name),
+            table=sql.Identifier(schema, table_name),
+            geom_col=sql.Identifier(geom_col)
+        ))
         
-        logger.info(f"Created spatial index {index_name}")
+        logger.info("Created spatial index %s", index_name)
         
     except Exception as e:
-        logger.error(f"Error creating spatial index: {e}")
\ No newline at end of file
+        logger.error("Error creating spatial index: %s", e)
\ No newline at end of file
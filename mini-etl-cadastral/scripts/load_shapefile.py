@@ -23,13 +23,24 @@ import logging
 from pathlib import Path
 import geopandas as gpd
 from dotenv import load_dotenv
-from insert_postgis import insert_geodataframe
-from geometry_utils import ensure_crs, normalize_geometry, calculate_geometry_stats
+from db_utils import vacuum_analyze
+from insert_postgis import insert_geodataframe, create_attribute_index
+from geometry_utils import calculate_geometry_stats
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Read through pyogrio with Arrow buffers when available, otherwise keep
+# the default engine (pyarrow is optional)
+try:
+    import pyogrio  # noqa: F401
+    import pyarrow  # noqa: F401
+    gpd.options.io_engine = "pyogrio"
+    READ_OPTIONS = {'engine': 'pyogrio', 'use_arrow': True}
+except ImportError:
+    READ_OPTIONS = {}
+
 
 def detect_commune_field(gdf: gpd.GeoDataFrame) -> str:
     """
@@ -56,16 +67,14 @@ def detect_commune_field(gdf: gpd.GeoDataFrame) -> str:
         'code_insee', 'insee', 'code_commune', 'depcom'
     ]
     
+    # Case insensitive lookup table, built once (first column wins)
+    lower_to_actual = {col.lower(): col for col in reversed(list(gdf.columns))}
+    
     for field in possible_fields:
-        if field in gdf.columns:
-            logger.info(f"Detected commune field: '{field}'")
-            return field
-        
-        # Case insensitive search
-        for col in gdf.columns:
-            if col.lower() == field:
-                logger.info(f"Detected commune field: '{col}'")
-                return col
+        col = field if field in gdf.columns else lower_to_actual.get(field)
+        if col:
+            logger.info("Detected commune field: '%s'", col)
+            return col
                 
     logger.warning("Could not detect commune field")
     return None
@@ -96,15 +105,16 @@ def standardize_columns(gdf: gpd.GeoDataFrame, infer_commune: bool = False) -> g
     }
     
     # Apply case-insensitive renaming
-    columns_lower = {col.upper(): col for col in gdf.columns}
+    lower_to_actual = {col.lower(): col for col in gdf.columns}
     final_rename = {}
     
     for old, new in rename_map.items():
-        if old in columns_lower:
-            final_rename[columns_lower[old]] = new
+        col = lower_to_actual.get(old.lower())
+        if col:
+            final_rename[col] = new
             
     if final_rename:
-        logger.info(f"Renaming columns: {final_rename}")
+        logger.info("Renaming columns: %s", final_rename)
         gdf = gdf.rename(columns=final_rename)
         
     # Infer commune field if requested
@@ -112,25 +122,29 @@ def standardize_columns(gdf: gpd.GeoDataFrame, infer_commune: bool = False) -> g
         commune_field = detect_commune_field(gdf)
         if commune_field and commune_field != 'nom':
             gdf = gdf.rename(columns={commune_field: 'nom'})
-            logger.info(f"Renamed '{commune_field}' to 'nom' for commune identification")
+            logger.info("Renamed '%s' to 'nom' for commune identification", commune_field)
             
     return gdf
 
 
 def validate_shapefile(filepath: Path) -> bool:
     """
-    Validate that shapefile exists and has required components.
+    Validate that the input file exists and, for a shapefile, has its required components.
     
     Args:
-        filepath: Path to .shp file
+        filepath: Path to .shp, .gpkg or .fgb file
         
     Returns:
-        True if valid shapefile
+        True if valid input file
     """
     if not filepath.exists():
-        logger.error(f"Shapefile not found: {filepath}")
+        logger.error("Input file not found: %s", filepath)
         return False
         
+    # GeoPackage and FlatGeobuf are self-contained single files
+    if filepath.suffix.lower() in ('.gpkg', '.fgb'):
+        return True
+        
     # Check for required shapefile components
     base = filepath.stem
     parent = filepath.parent
@@ -141,13 +155,13 @@ def validate_shapefile(filepath: Path) -> bool:
     for ext in required:
         component = parent / f"{base}{ext}"
         if not component.exists():
-            logger.error(f"Missing required shapefile component: {component}")
+            logger.error("Missing required shapefile component: %s", component)
             return False
             
     for ext in optional:
         component = parent / f"{base}{ext}"
         if not component.exists():
-            logger.warning(f"Missing optional shapefile component: {component}")
+            logger.warning("Missing optional shapefile component: %s", component)
             
     return True
 
@@ -156,7 +170,8 @@ def load_shapefile(shp_path: str,
                    table_name: str = None,
                    target_srid: int = None,
                    infer_commune: bool = False,
-                   mode: str = 'append') -> bool:
+                   mode: str = 'append',
+                   workers: int = 1) -> bool:
     """
     Load shapefile into PostGIS database.
     
@@ -166,6 +181,7 @@ def load_shapefile(shp_path: str,
         target_srid: Target SRID (from env if not provided)
         infer_commune: Try to detect commune field
         mode: Insert mode ('append', 'replace')
+        workers: Number of concurrent COPY connections
         
     Returns:
         True if successful
@@ -183,13 +199,13 @@ def load_shapefile(shp_path: str,
         if not validate_shapefile(filepath):
             return False
             
-        logger.info(f"Loading shapefile: {filepath}")
-        logger.info(f"Target table: {table_name}")
-        logger.info(f"Target SRID: {target_srid}")
+        logger.info("Loading shapefile: %s", filepath)
+        logger.info("Target table: %s", table_name)
+        logger.info("Target SRID: %s", target_srid)
         
         # Read shapefile
-        gdf = gpd.read_file(filepath)
-        logger.info(f"Read {len(gdf)} features from shapefile")
+        gdf = gpd.read_file(filepath, **READ_OPTIONS)
+        logger.info("Read %s features from shapefile", len(gdf))
         
         if gdf.empty:
             logger.error("Shapefile is empty")
@@ -197,42 +213,56 @@ def load_shapefile(shp_path: str,
             
         # Log original CRS
         if gdf.crs:
-            logger.info(f"Original CRS: {gdf.crs} (EPSG:{gdf.crs.to_epsg()})")
+            logger.info("Original CRS: %s (EPSG:%s)", gdf.crs, gdf.crs.to_epsg())
         else:
             logger.warning("No CRS found in shapefile")
             
         # Print geometry statistics
         stats = calculate_geometry_stats(gdf)
-        logger.info(f"Geometry statistics: {stats}")
+        logger.info("Geometry statistics: %s", stats)
         
         # Standardize columns
+        original_columns = list(gdf.columns)
         gdf = standardize_columns(gdf, infer_commune)
         
-        # Ensure target CRS
-        gdf = ensure_crs(gdf, target_srid)
-        
-        # Normalize geometries
-        gdf = normalize_geometry(gdf)
+        # The file can be handed to ogr2ogr as-is only if nothing was renamed or added
+        source_path = filepath if list(gdf.columns) == original_columns else None
         
-        # Insert into PostGIS
+        # Insert into PostGIS: geometries are normalized once by
+        # insert_geodataframe and reprojected by PostGIS (ST_Transform)
         success = insert_geodataframe(
             gdf=gdf,
             table_name=table_name,
             srid=target_srid,
-            mode=mode
+            mode=mode,
+            normalize=True,
+            reproject_on_server=True,
+            source_path=source_path,
+            workers=workers,
+            # Statistics come from the VACUUM ANALYZE below
+            analyze=False
         )
         
         if success:
-            logger.info(f"✓ Successfully loaded {len(gdf)} features into {table_name}")
+            # Post-load: index the commune field that query_examples filters
+            # on (the GiST index is built by the insert), then vacuum so the
+            # visibility map is set after the bulk load
+            commune_field = os.getenv('COMMUNE_FIELD', 'nom')
+            if commune_field in gdf.columns:
+                create_attribute_index(table_name, commune_field)
+            try:
+                vacuum_analyze(table_name)
+            except Exception as e:
+                logger.warning("Could not vacuum %s: %s", table_name, e)
+                
+            logger.info("✓ Successfully loaded %s features into %s", len(gdf), table_name)
         else:
             logger.error("✗ Failed to load shapefile into database")
             
         return success
         
-    except Exception as e:
-        logger.error(f"Error loading shapefile: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Error loading shapefile")
         return False
 
 
@@ -246,7 +276,7 @@ def main():
     parser.add_argument(
         '--shp',
         required=True,
-        help='Path to shapefile (.shp)'
+        help='Path to shapefile (.shp), GeoPackage (.gpkg) or FlatGeobuf (.fgb)'
     )
     
     parser.add_argument(
@@ -273,6 +303,13 @@ def main():
         help='Insert mode (default: append)'
     )
     
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Concurrent COPY connections for a new or replaced table (default: 1)'
+    )
+    
     args = parser.parse_args()
     
     # Check if database is accessible
@@ -280,7 +317,7 @@ def main():
         from db_utils import execute_query
         execute_query("SELECT 1;", fetch=True)
     except Exception as e:
-        logger.error(f"Cannot connect to database: {e}")
+        logger.error("Cannot connect to database: %s", e)
         logger.error("Make sure PostgreSQL is running (docker compose up -d)")
         sys.exit(1)
     
@@ -290,7 +327,8 @@ def main():
         table_name=args.table,
         target_srid=args.srid,
         infer_commune=args.infer_commune,
-        mode=args.mode
+        mode=args.mode,
+        workers=args.workers
     )
     
     sys.exit(0 if success else 1)
@@ -12,7 +12,7 @@ Processus:
 2. Sélectionne 5 communes de l'agglomération dijonnaise
 3. Génère des parcelles rectangulaires dans chaque commune
 4. Attribue des sections et numéros cadastraux réalistes
-5. Exporte en shapefile compatible PostGIS
+5. Exporte en GeoPackage (ou shapefile/FlatGeobuf selon l'extension)
 
 Utilisation:
     python prepare_demo_data.py [--communes liste] [--output fichier]
@@ -23,14 +23,33 @@ Licence: MIT
 
 import geopandas as gpd
 import pandas as pd
-from shapely.geometry import Point, box
-from shapely.ops import unary_union
+import shapely
 import numpy as np
 from pathlib import Path
+from email.utils import formatdate
+import shutil
 import sys
+import urllib.error
+import urllib.request
+
+COMMUNES_URL = "https://raw.githubusercontent.com/gregoiredavid/france-geojson/master/departements/21-cote-d-or/communes-21-cote-d-or.geojson"
+
+# pyogrio for bulk reads/writes (+ Arrow for reads) when available,
+# default engine otherwise
+try:
+    import pyogrio  # noqa: F401
+    gpd.options.io_engine = "pyogrio"
+    WRITE_OPTIONS = {'engine': 'pyogrio'}
+    try:
+        import pyarrow  # noqa: F401
+        READ_OPTIONS = {'engine': 'pyogrio', 'use_arrow': True}
+    except ImportError:
+        READ_OPTIONS = {'engine': 'pyogrio'}
+except ImportError:
+    READ_OPTIONS = WRITE_OPTIONS = {}
 
 def create_parcels_from_communes(communes_file='data/communes_21.geojson', 
-                                output_file='data/cote_dor_sample.shp',
+                                output_file='data/cote_dor_sample.gpkg',
                                 target_communes=['Dijon', 'Quetigny', 'Chenôve', 'Talant', 'Longvic']):
     """
     Génère des parcelles cadastrales fictives dans de vraies communes.
@@ -41,7 +60,8 @@ def create_parcels_from_communes(communes_file='data/communes_21.geojson',
     
     Args:
         communes_file: Fichier GeoJSON des communes (source france-geojson)
-        output_file: Shapefile de sortie pour les parcelles
+        output_file: Fichier de sortie des parcelles (.gpkg, .fgb ou .shp,
+            le format est déduit de l'extension)
         target_communes: Liste des communes à traiter
         
     Returns:
@@ -57,8 +77,19 @@ def create_parcels_from_communes(communes_file='data/communes_21.geojson',
     """
     print(f"📍 Chargement des communes de Côte-d'Or...")
     
-    # Read communes
-    communes = gpd.read_file(communes_file)
+    # Read communes: with pyogrio the name filter is pushed down to GDAL
+    # so the other communes are never parsed; full read otherwise, or if
+    # the filter is rejected or matches nothing
+    communes = None
+    if READ_OPTIONS:
+        names = ', '.join("'{}'".format(c.replace("'", "''")) for c in target_communes)
+        try:
+            communes = gpd.read_file(communes_file, where=f"nom IN ({names})", **READ_OPTIONS)
+        except ValueError:
+            communes = None
+            
+    if communes is None or communes.empty:
+        communes = gpd.read_file(communes_file, **READ_OPTIONS)
     print(f"  - {len(communes)} communes trouvées")
     
     # Filter target communes
@@ -77,85 +108,135 @@ def create_parcels_from_communes(communes_file='data/communes_21.geojson',
     print(f"  - Communes sélectionnées : {', '.join(target_gdf['nom'].tolist())}")
     
     # Ensure CRS is set
-    if target_gdf.crs != 'EPSG:2154':
+    target_epsg = target_gdf.crs.to_epsg() if target_gdf.crs else None
+    if target_epsg != 2154:
         print(f"  - Reprojection vers Lambert-93 (EPSG:2154)")
-        target_gdf = target_gdf.to_crs('EPSG:2154')
+        target_gdf = target_gdf.to_crs(2154)
+    
+    # Create sample parcels within each commune, collected column by
+    # column as one array per commune
+    noms, codes, sections, numeros, surfaces = [], [], [], [], []
+    geom_chunks = []
+    section_codes = np.array(['AA', 'AB', 'AC', 'AD', 'ZA', 'ZB'])
     
-    # Create sample parcels within each commune
-    all_parcels = []
-    parcel_id = 1
+    # One generator for every commune (reproducible, independent draws)
+    # and bounds/areas computed once for all communes
+    rng = np.random.default_rng(42)
+    bounds = target_gdf.geometry.bounds.to_numpy()
+    areas = target_gdf.geometry.area.to_numpy()
     
-    for idx, commune in target_gdf.iterrows():
+    for pos, (idx, commune) in enumerate(target_gdf.iterrows()):
         commune_geom = commune.geometry
         commune_name = commune['nom']
         commune_code = commune.get('code', f"21{idx:03d}")
         
         # Get commune bounds
-        minx, miny, maxx, maxy = commune_geom.bounds
+        minx, miny, maxx, maxy = bounds[pos]
         
         # Create a grid of parcels within the commune
         # Number of parcels proportional to commune area (but limited)
-        area_km2 = commune_geom.area / 1_000_000
+        area_km2 = areas[pos] / 1_000_000
         n_parcels = min(int(area_km2 * 5), 50)  # 5 parcels per km², max 50
         
         print(f"  - Génération de {n_parcels} parcelles pour {commune_name}...")
         
-        # Generate random points within commune bounds
-        np.random.seed(42 + idx)  # For reproducibility
+        # Draw every candidate at once (10 per parcel, as the former retry
+        # limit) and keep the first n_parcels whose centroid is inside
+        n_candidates = n_parcels * 10
+        xs = rng.uniform(minx, maxx, size=n_candidates)
+        ys = rng.uniform(miny, maxy, size=n_candidates)
+        sizes = rng.uniform(50, 200, size=n_candidates)  # 50-200m parcels
         
-        for i in range(n_parcels):
-            # Try to create a parcel within the commune
-            attempts = 0
-            while attempts < 10:
-                # Random point within bounds
-                x = np.random.uniform(minx, maxx)
-                y = np.random.uniform(miny, maxy)
-                
-                # Create a small rectangle around the point
-                size = np.random.uniform(50, 200)  # 50-200m parcels
-                parcel = box(x, y, x + size, y + size)
-                
-                # Check if parcel is within commune
-                if commune_geom.contains(parcel.centroid):
-                    # Create parcel data
-                    section = np.random.choice(['AA', 'AB', 'AC', 'AD', 'ZA', 'ZB'])
-                    numero = f"{i+1:04d}"
-                    surface = parcel.area
-                    
-                    all_parcels.append({
-                        'id': parcel_id,
-                        'nom': commune_name,
-                        'code_insee': commune_code,
-                        'section': section,
-                        'numero': numero,
-                        'surface': surface,
-                        'geometry': parcel
-                    })
-                    parcel_id += 1
-                    break
-                    
-                attempts += 1
-    
-    # Create GeoDataFrame
-    parcels_gdf = gpd.GeoDataFrame(all_parcels, crs='EPSG:2154')
+        # Prepared commune polygon, centroids tested as raw coordinates
+        shapely.prepare(commune_geom)
+        inside = shapely.contains_xy(commune_geom, xs + sizes / 2, ys + sizes / 2)
+        kept = np.flatnonzero(inside)[:n_parcels]
+        parcels = shapely.box(xs[kept], ys[kept], xs[kept] + sizes[kept], ys[kept] + sizes[kept])
+        n_kept = len(parcels)
+        
+        # Parcel attributes, one array call each
+        geom_chunks.append(parcels)
+        noms.append(np.full(n_kept, commune_name, dtype=object))
+        codes.append(np.full(n_kept, commune_code, dtype=object))
+        sections.append(rng.choice(section_codes, size=n_kept))
+        numeros.append(np.char.mod('%04d', np.arange(1, n_kept + 1)))
+        surfaces.append(shapely.area(parcels))
+    
+    # Create GeoDataFrame from the columns
+    def concat(chunks):
+        return np.concatenate(chunks) if chunks else []
+        
+    n_total = sum(len(chunk) for chunk in geom_chunks)
+    parcels_gdf = gpd.GeoDataFrame(
+        {
+            'id': np.arange(1, n_total + 1),
+            'nom': concat(noms),
+            'code_insee': concat(codes),
+            'section': concat(sections),
+            'numero': concat(numeros),
+            'surface': concat(surfaces),
+        },
+        geometry=concat(geom_chunks),
+        crs=2154
+    )
     
     print(f"\n✅ Création terminée :")
     print(f"  - {len(parcels_gdf)} parcelles générées")
     print(f"  - Communes : {', '.join(parcels_gdf['nom'].unique())}")
     print(f"  - Surface totale : {parcels_gdf['surface'].sum()/10000:.2f} ha")
     
-    # Save to shapefile
+    # Save parcels; the driver follows the extension (GPKG by default)
     output_path = Path(output_file)
-    parcels_gdf.to_file(output_path)
-    print(f"\n💾 Shapefile sauvegardé : {output_path}")
+    parcels_gdf.to_file(output_path, **WRITE_OPTIONS)
+    print(f"\n💾 Parcelles sauvegardées : {output_path}")
     
-    # Also save communes for reference
-    communes_output = output_path.parent / 'communes_cote_dor.shp'
-    target_gdf[['nom', 'code', 'geometry']].to_file(communes_output)
+    # Also save communes for reference, in the same format
+    communes_output = output_path.with_name(f"communes_cote_dor{output_path.suffix}")
+    target_gdf[['nom', 'code', 'geometry']].to_file(communes_output, **WRITE_OPTIONS)
     print(f"💾 Communes sauvegardées : {communes_output}")
     
     return parcels_gdf
 
+def download_communes(communes_file, url=COMMUNES_URL):
+    """
+    Télécharge le GeoJSON des communes en streaming.
+    
+    Si le fichier existe déjà, la requête est conditionnelle
+    (If-Modified-Since sur sa date de modification) : une réponse 304
+    conserve le fichier local sans rien télécharger.
+    
+    Args:
+        communes_file: Fichier GeoJSON de destination
+        url: URL source (france-geojson)
+        
+    Returns:
+        bool: True si le fichier est disponible localement
+    """
+    path = Path(communes_file)
+    request = urllib.request.Request(url)
+    if path.exists():
+        request.add_header('If-Modified-Since', formatdate(path.stat().st_mtime, usegmt=True))
+        
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            # Write to a temporary file first so an interrupted download
+            # never leaves a truncated GeoJSON behind
+            tmp_path = path.with_name(path.name + '.part')
+            with open(tmp_path, 'wb') as f:
+                shutil.copyfileobj(response, f, 64 * 1024)
+            tmp_path.replace(path)
+        print(f"  - Communes téléchargées : {path}")
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            print(f"  - Communes à jour : {path}")
+        else:
+            print(f"❌ Échec du téléchargement ({e.code}) : {url}")
+    except urllib.error.URLError as e:
+        print(f"❌ Échec du téléchargement ({e.reason}) : {url}")
+        
+    return path.exists()
+
+
 def main():
     """Main entry point."""
     import argparse
@@ -163,20 +244,23 @@ def main():
     parser = argparse.ArgumentParser(description='Prépare des données de démonstration')
     parser.add_argument('--communes', default='data/communes_21.geojson',
                        help='Fichier GeoJSON des communes')
-    parser.add_argument('--output', default='data/cote_dor_sample.shp',
-                       help='Fichier shapefile de sortie')
+    parser.add_argument('--output', default='data/cote_dor_sample.gpkg',
+                       help='Fichier de sortie (.gpkg, .fgb ou .shp)')
     parser.add_argument('--list', nargs='+', 
                        default=['Dijon', 'Quetigny', 'Chenôve', 'Talant', 'Longvic'],
                        help='Liste des communes à traiter')
+    parser.add_argument('--refresh', action='store_true',
+                       help='Revalider le GeoJSON des communes auprès de la source (If-Modified-Since)')
     
     args = parser.parse_args()
     
-    # Check if communes file exists
+    # Download the communes file if missing, or revalidate it on --refresh
     if not Path(args.communes).exists():
         print(f"❌ Fichier non trouvé : {args.communes}")
         print("Téléchargement en cours...")
-        import os
-        os.system(f'curl -L -o {args.communes} "https://raw.githubusercontent.com/gregoiredavid/france-geojson/master/departements/21-cote-d-or/communes-21-cote-d-or.geojson"')
+        download_communes(args.communes)
+    elif args.refresh:
+        download_communes(args.communes)
     
     # Create parcels
     create_parcels_from_communes(
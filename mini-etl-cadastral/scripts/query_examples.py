@@ -25,119 +25,250 @@ import os
 import sys
 import argparse
 import logging
+from functools import lru_cache
 from pathlib import Path
 import pandas as pd
+import shapely
+from psycopg2 import sql
 from dotenv import load_dotenv
-from db_utils import execute_query, table_exists, read_postgis_to_gdf
+from db_utils import execute_query, table_exists, read_postgis_to_gdf, export_query_to_csv
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
-def query_by_commune(commune_value: str, 
-                     table_name: str = 'parcelles',
-                     commune_field: str = None) -> pd.DataFrame:
+# Schema lookups are cached for the life of the process: the CLI calls
+# them repeatedly for the same tables
+table_exists = lru_cache(maxsize=128)(table_exists)
+
+
+@lru_cache(maxsize=128)
+def get_table_columns(table_name: str, schema: str = 'public') -> tuple:
+    """List (column_name, data_type) pairs of a table, in table order."""
+    query = """
+        SELECT column_name, data_type 
+        FROM information_schema.columns 
+        WHERE table_schema = %s
+        AND table_name = %s
+        ORDER BY ordinal_position;
     """
-    Query features by commune name or code.
+    result = execute_query(query, (schema, table_name), fetch=True)
+    return tuple((row['column_name'], row['data_type']) for row in result or [])
+
+
+def clear_schema_cache() -> None:
+    """Forget cached table and column lookups (after a reconnect or DDL)."""
+    table_exists.cache_clear()
+    get_table_columns.cache_clear()
+
+
+def resolve_commune_field(table_name: str, commune_field: str = None) -> str:
+    """
+    Resolve the column holding the commune name or code.
     
     Args:
-        commune_value: Commune name or INSEE code
         table_name: Table to query
-        commune_field: Field containing commune info
+        commune_field: Preferred field (default from COMMUNE_FIELD env)
         
     Returns:
-        DataFrame with results
+        Field name, None if no suitable field exists
     """
-    if not table_exists(table_name):
-        logger.error(f"Table '{table_name}' does not exist")
-        return pd.DataFrame()
-        
     # Get commune field from env if not provided
     if not commune_field:
         commune_field = os.getenv('COMMUNE_FIELD', 'nom')
         
-    # Check if commune field exists in table
-    check_query = f"""
-        SELECT column_name 
-        FROM information_schema.columns 
-        WHERE table_name = %s 
-        AND column_name = %s;
-    """
-    
-    result = execute_query(check_query, (table_name, commune_field), fetch=True)
+    # Resolved in Python against the cached column list
+    columns = dict(get_table_columns(table_name))
     
-    if not result:
-        logger.warning(f"Field '{commune_field}' not found in table '{table_name}'")
+    if commune_field not in columns:
+        logger.warning("Field '%s' not found in table '%s'", commune_field, table_name)
         
         # Try to find a suitable field
-        fallback_query = f"""
-            SELECT column_name 
-            FROM information_schema.columns 
-            WHERE table_name = %s 
-            AND column_name IN ('nom', 'commune', 'code_insee', 'insee', 'nom_com')
-            LIMIT 1;
-        """
-        
-        fallback = execute_query(fallback_query, (table_name,), fetch=True)
+        fallback = next(
+            (field for field in ('nom', 'commune', 'code_insee', 'insee', 'nom_com') if field in columns),
+            None
+        )
         
         if fallback:
-            commune_field = fallback[0]['column_name']
-            logger.info(f"Using fallback field: '{commune_field}'")
+            commune_field = fallback
+            logger.info("Using fallback field: '%s'", commune_field)
         else:
             logger.error("No suitable commune field found in table")
             logger.info("Available columns:")
             
-            cols_query = f"""
-                SELECT column_name, data_type 
-                FROM information_schema.columns 
-                WHERE table_name = %s
-                ORDER BY ordinal_position;
-            """
-            
-            cols = execute_query(cols_query, (table_name,), fetch=True)
-            for col in cols:
-                if col['column_name'] != 'geom':
-                    logger.info(f"  - {col['column_name']} ({col['data_type']})")
+            for name, data_type in columns.items():
+                if name != 'geom':
+                    logger.info("  - %s (%s)", name, data_type)
                     
-            return pd.DataFrame()
+            return None
+            
+    return commune_field
+
+
+def query_by_commune(commune_value: str, 
+                     table_name: str = 'parcelles',
+                     commune_field: str = None,
+                     include_geometry: bool = False) -> pd.DataFrame:
+    """
+    Query features by commune name or code.
     
+    Args:
+        commune_value: Commune name or INSEE code
+        table_name: Table to query
+        commune_field: Field containing commune info
+        include_geometry: Also fetch the geometries, decoded from EWKB
+            into a 'geometry' column of shapely objects
+        
+    Returns:
+        DataFrame with results
+    """
+    if not table_exists(table_name):
+        logger.error("Table '%s' does not exist", table_name)
+        return pd.DataFrame()
+        
+    commune_field = resolve_commune_field(table_name, commune_field)
+    if not commune_field:
+        return pd.DataFrame()
+        
     # Query by commune
-    logger.info(f"Querying {table_name} where {commune_field} = '{commune_value}'")
+    logger.info("Querying %s where %s = '%s'", table_name, commune_field, commune_value)
     
-    query = f"""
-        SELECT *, ST_AsText(geom) as wkt_geom
-        FROM {table_name}
-        WHERE {commune_field} = %s;
-    """
+    # Attributes only by default; geom comes back as EWKB hex when requested
+    columns = [sql.Identifier(name) for name, _ in get_table_columns(table_name) if name != 'geom']
+    if include_geometry:
+        columns.append(sql.Identifier('geom'))
+        
+    # Identifiers are quoted by psycopg2, the value stays a bound parameter
+    query = sql.SQL("""
+        SELECT {columns}
+        FROM {table}
+        WHERE {field} = %s;
+    """).format(
+        columns=sql.SQL(', ').join(columns),
+        table=sql.Identifier(table_name),
+        field=sql.Identifier(commune_field)
+    )
     
     results = execute_query(query, (commune_value,), fetch=True)
     
     if results:
-        logger.info(f"Found {len(results)} features in commune '{commune_value}'")
-        return pd.DataFrame(results)
+        logger.info("Found %s features in commune '%s'", len(results), commune_value)
+        df = pd.DataFrame(results)
+        
+        if include_geometry:
+            # Decode every geometry in one vectorised call
+            values = df.pop('geom').to_numpy(dtype=object)
+            values[pd.isna(values)] = None
+            df['geometry'] = shapely.from_wkb(values)
+            
+        return df
     else:
-        logger.warning(f"No features found for commune '{commune_value}'")
+        logger.warning("No features found for commune '%s'", commune_value)
         
         # Show available values
-        distinct_query = f"""
-            SELECT DISTINCT {commune_field} 
-            FROM {table_name} 
-            WHERE {commune_field} IS NOT NULL
-            ORDER BY {commune_field}
+        distinct_query = sql.SQL("""
+            SELECT DISTINCT {field} 
+            FROM {table} 
+            WHERE {field} IS NOT NULL
+            ORDER BY {field}
             LIMIT 10;
-        """
+        """).format(field=sql.Identifier(commune_field), table=sql.Identifier(table_name))
         
         distinct_vals = execute_query(distinct_query, fetch=True)
         
         if distinct_vals:
             logger.info("Available commune values (first 10):")
             for val in distinct_vals:
-                logger.info(f"  - {val[commune_field]}")
+                logger.info("  - %s", val[commune_field])
                 
         return pd.DataFrame()
 
 
+def _report_statistics(stats: dict, commune_value: str) -> dict:
+    """Add hectare values to raw area/perimeter aggregates and log them."""
+    # Convert to hectares for readability (assuming m² from Lambert-93)
+    if stats['total_area']:
+        stats['total_area_ha'] = stats['total_area'] / 10000
+        stats['avg_area_ha'] = stats['avg_area'] / 10000
+        stats['min_area_ha'] = stats['min_area'] / 10000
+        stats['max_area_ha'] = stats['max_area'] / 10000
+        
+    logger.info("\nStatistics for commune '%s':", commune_value)
+    logger.info("  Number of features: %s", stats['count'])
+    
+    if stats['total_area']:
+        logger.info("  Total area: %.2f ha", stats['total_area_ha'])
+        logger.info("  Average area: %.4f ha", stats['avg_area_ha'])
+        logger.info("  Min area: %.4f ha", stats['min_area_ha'])
+        logger.info("  Max area: %.4f ha", stats['max_area_ha'])
+        logger.info("  Total perimeter: %.2f m", stats['total_perimeter'])
+        logger.info("  Average perimeter: %.2f m", stats['avg_perimeter'])
+        
+    return stats
+
+
+def query_commune_with_statistics(commune_value: str,
+                                  table_name: str = 'parcelles',
+                                  commune_field: str = None) -> tuple:
+    """
+    Fetch the features of a commune and their spatial statistics in one round-trip.
+    
+    The commune rows are selected once in a CTE, with area and perimeter
+    computed once per row; the aggregates and the JSON-aggregated
+    attribute rows are both computed from it.
+    
+    Args:
+        commune_value: Commune name or INSEE code
+        table_name: Table to query
+        commune_field: Field containing commune info
+        
+    Returns:
+        (DataFrame with results, dictionary with statistics)
+    """
+    if not table_exists(table_name):
+        logger.error("Table '%s' does not exist", table_name)
+        return pd.DataFrame(), {}
+        
+    commune_field = resolve_commune_field(table_name, commune_field)
+    if not commune_field:
+        return pd.DataFrame(), {}
+        
+    columns = sql.SQL(', ').join(
+        sql.Identifier(name) for name, _ in get_table_columns(table_name) if name != 'geom'
+    )
+    query = sql.SQL("""
+        WITH f AS (
+            SELECT {columns}, ST_Area(geom) AS a, ST_Perimeter(geom) AS p
+            FROM {table}
+            WHERE {field} = %s
+        )
+        SELECT 
+            COUNT(*) as count,
+            SUM(a) as total_area,
+            AVG(a) as avg_area,
+            MIN(a) as min_area,
+            MAX(a) as max_area,
+            SUM(p) as total_perimeter,
+            AVG(p) as avg_perimeter,
+            (SELECT json_agg(r) FROM (SELECT {columns} FROM f) r) as features
+        FROM f;
+    """).format(columns=columns, table=sql.Identifier(table_name), field=sql.Identifier(commune_field))
+    
+    result = execute_query(query, (commune_value,), fetch=True)
+    
+    if not result or result[0]['count'] == 0:
+        logger.warning("No features found for commune '%s'", commune_value)
+        return pd.DataFrame(), {}
+        
+    # psycopg2 decodes the json column into a list of dicts
+    stats = dict(result[0])
+    df = pd.DataFrame(stats.pop('features'))
+    logger.info("Found %s features in commune '%s'", len(df), commune_value)
+    
+    return df, _report_statistics(stats, commune_value)
+
+
 def calculate_commune_statistics(commune_value: str,
                                 table_name: str = 'parcelles',
                                 commune_field: str = None) -> dict:
@@ -153,64 +284,50 @@ def calculate_commune_statistics(commune_value: str,
         Dictionary with statistics
     """
     if not table_exists(table_name):
-        logger.error(f"Table '{table_name}' does not exist")
+        logger.error("Table '%s' does not exist", table_name)
         return {}
         
+    commune_field = resolve_commune_field(table_name, commune_field)
     if not commune_field:
-        commune_field = os.getenv('COMMUNE_FIELD', 'nom')
+        return {}
         
-    # Check if we can use spatial operations
-    query = f"""
+    # Area and perimeter are computed once per row, then aggregated; the CTE
+    # is read once, so it must be MATERIALIZED or PostgreSQL 12+ inlines it
+    query = sql.SQL("""
+        WITH f AS MATERIALIZED (
+            SELECT ST_Area(geom) AS a, ST_Perimeter(geom) AS p
+            FROM {table}
+            WHERE {field} = %s
+        )
         SELECT 
             COUNT(*) as count,
-            SUM(ST_Area(geom)) as total_area,
-            AVG(ST_Area(geom)) as avg_area,
-            MIN(ST_Area(geom)) as min_area,
-            MAX(ST_Area(geom)) as max_area,
-            SUM(ST_Perimeter(geom)) as total_perimeter,
-            AVG(ST_Perimeter(geom)) as avg_perimeter
-        FROM {table_name}
-        WHERE {commune_field} = %s;
-    """
+            SUM(a) as total_area,
+            AVG(a) as avg_area,
+            MIN(a) as min_area,
+            MAX(a) as max_area,
+            SUM(p) as total_perimeter,
+            AVG(p) as avg_perimeter
+        FROM f;
+    """).format(table=sql.Identifier(table_name), field=sql.Identifier(commune_field))
     
     try:
         result = execute_query(query, (commune_value,), fetch=True)
         
         if result and result[0]['count'] > 0:
-            stats = result[0]
-            
-            # Convert to hectares for readability (assuming m² from Lambert-93)
-            if stats['total_area']:
-                stats['total_area_ha'] = stats['total_area'] / 10000
-                stats['avg_area_ha'] = stats['avg_area'] / 10000
-                stats['min_area_ha'] = stats['min_area'] / 10000
-                stats['max_area_ha'] = stats['max_area'] / 10000
-                
-            logger.info(f"\nStatistics for commune '{commune_value}':")
-            logger.info(f"  Number of features: {stats['count']}")
-            
-            if stats['total_area']:
-                logger.info(f"  Total area: {stats['total_area_ha']:.2f} ha")
-                logger.info(f"  Average area: {stats['avg_area_ha']:.4f} ha")
-                logger.info(f"  Min area: {stats['min_area_ha']:.4f} ha")
-                logger.info(f"  Max area: {stats['max_area_ha']:.4f} ha")
-                logger.info(f"  Total perimeter: {stats['total_perimeter']:.2f} m")
-                logger.info(f"  Average perimeter: {stats['avg_perimeter']:.2f} m")
-                
-            return stats
+            return _report_statistics(result[0], commune_value)
         else:
-            logger.warning(f"No statistics available for commune '{commune_value}'")
+            logger.warning("No statistics available for commune '%s'", commune_value)
             return {}
             
     except Exception as e:
-        logger.error(f"Error calculating statistics: {e}")
+        logger.error("Error calculating statistics: %s", e)
         
         # Fallback to simple count
-        count_query = f"""
+        count_query = sql.SQL("""
             SELECT COUNT(*) as count
-            FROM {table_name}
-            WHERE {commune_field} = %s;
-        """
+            FROM {table}
+            WHERE {field} = %s;
+        """).format(table=sql.Identifier(table_name), field=sql.Identifier(commune_field))
         
         result = execute_query(count_query, (commune_value,), fetch=True)
         
@@ -233,15 +350,15 @@ def spatial_intersection_query(table1: str = 'parcelles',
         DataFrame with intersection results
     """
     if not table_exists(table1):
-        logger.warning(f"Table '{table1}' does not exist")
+        logger.warning("Table '%s' does not exist", table1)
         return pd.DataFrame()
         
     if not table_exists(table2):
-        logger.info(f"Table '{table2}' does not exist - skipping spatial intersection")
-        logger.info(f"To use this feature, load commune boundaries into '{table2}' table")
+        logger.info("Table '%s' does not exist - skipping spatial intersection", table2)
+        logger.info("To use this feature, load commune boundaries into '%s' table", table2)
         return pd.DataFrame()
         
-    query = f"""
+    query = sql.SQL("""
         SELECT 
             t1.id as parcelle_id,
             t2.nom as commune_nom,
@@ -251,23 +368,66 @@ def spatial_intersection_query(table1: str = 'parcelles',
         FROM {table1} t1
         JOIN {table2} t2 ON ST_Intersects(t1.geom, t2.geom)
         LIMIT 100;
-    """
+    """).format(table1=sql.Identifier(table1), table2=sql.Identifier(table2))
     
     try:
         results = execute_query(query, fetch=True)
         
         if results:
-            logger.info(f"Found {len(results)} spatial intersections")
+            logger.info("Found %s spatial intersections", len(results))
             return pd.DataFrame(results)
         else:
             logger.info("No spatial intersections found")
             return pd.DataFrame()
             
     except Exception as e:
-        logger.error(f"Spatial query error: {e}")
+        logger.error("Spatial query error: %s", e)
         return pd.DataFrame()
 
 
+def export_commune_to_csv(commune_value: str,
+                          table_name: str = 'parcelles',
+                          commune_field: str = None,
+                          filename: str = 'query_result.csv') -> int:
+    """
+    Export the features of a commune to CSV, streamed by PostgreSQL (COPY TO STDOUT).
+    
+    Same rows and attribute columns as query_by_commune, without geometry.
+    
+    Args:
+        commune_value: Commune name or INSEE code
+        table_name: Table to query
+        commune_field: Field containing commune info
+        filename: Output filename
+        
+    Returns:
+        Number of rows exported
+    """
+    if not table_exists(table_name):
+        logger.error("Table '%s' does not exist", table_name)
+        return 0
+        
+    commune_field = resolve_commune_field(table_name, commune_field)
+    if not commune_field:
+        return 0
+        
+    output_dir = Path('data/outputs')
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    columns = [sql.Identifier(name) for name, _ in get_table_columns(table_name) if name != 'geom']
+    query = sql.SQL("""
+        SELECT {columns}
+        FROM {table}
+        WHERE {field} = %s
+    """).format(
+        columns=sql.SQL(', ').join(columns),
+        table=sql.Identifier(table_name),
+        field=sql.Identifier(commune_field)
+    )
+    
+    return export_query_to_csv(query, (commune_value,), output_dir / filename)
+
+
 def export_results(df: pd.DataFrame, filename: str = 'query_result.csv') -> None:
     """
     Export query results to CSV.
@@ -294,7 +454,7 @@ def export_results(df: pd.DataFrame, filename: str = 'query_result.csv') -> None
             export_df = export_df.drop(columns=[col])
             
     export_df.to_csv(output_path, index=False)
-    logger.info(f"Results exported to: {output_path}")
+    logger.info("Results exported to: %s", output_path)
 
 
 def main():
@@ -342,7 +502,7 @@ def main():
     try:
         execute_query("SELECT 1;", fetch=True)
     except Exception as e:
-        logger.error(f"Cannot connect to database: {e}")
+        logger.error("Cannot connect to database: %s", e)
         logger.error("Make sure PostgreSQL is running (docker compose up -d)")
         sys.exit(1)
     
@@ -351,26 +511,33 @@ def main():
     logger.info("SPATIAL QUERY EXAMPLES")
     logger.info("=" * 50)
     
-    # Query 1: Select by commune
-    logger.info("\n1. Query by commune:")
-    df_commune = query_by_commune(commune_value, table_name, commune_field)
-    
-    # Query 2: Calculate statistics
-    if args.stats or True:  # Always show stats
-        logger.info("\n2. Spatial statistics:")
-        stats = calculate_commune_statistics(commune_value, table_name, commune_field)
+    # Query 1: Select by commune. With --export the rows are streamed to
+    # CSV by PostgreSQL and never fetched into Python; otherwise they are
+    # fetched with their statistics in the same round-trip when --stats is given
+    stats = {}
+    if args.export:
+        logger.info("\n1. Export by commune:")
+        count = export_commune_to_csv(commune_value, table_name, commune_field,
+                                      f"commune_{commune_value}_parcelles.csv")
+        if count == 0:
+            logger.warning("No features found for commune '%s'", commune_value)
+        elif args.stats:
+            stats = calculate_commune_statistics(commune_value, table_name, commune_field)
+    elif args.stats:
+        logger.info("\n1. Query by commune with spatial statistics:")
+        df_commune, stats = query_commune_with_statistics(commune_value, table_name, commune_field)
+    else:
+        logger.info("\n1. Query by commune:")
+        df_commune = query_by_commune(commune_value, table_name, commune_field)
     
-    # Query 3: Spatial intersection (if communes table exists)
-    logger.info("\n3. Spatial intersection example:")
+    # Query 2: Spatial intersection (if communes table exists)
+    logger.info("\n2. Spatial intersection example:")
     df_intersect = spatial_intersection_query()
     
-    # Export results if requested
-    if args.export and not df_commune.empty:
-        export_results(df_commune, f"commune_{commune_value}_parcelles.csv")
-        
-        if stats:
-            stats_df = pd.DataFrame([stats])
-            export_results(stats_df, f"commune_{commune_value}_stats.csv")
+    # Export statistics if requested
+    if args.export and stats:
+        stats_df = pd.DataFrame([stats])
+        export_results(stats_df, f"commune_{commune_value}_stats.csv")
     
     logger.info("\n" + "=" * 50)
     logger.info("Query execution complete")
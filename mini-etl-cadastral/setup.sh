@@ -191,16 +191,8 @@ download_sample_data() {
     print_step "Préparation des données d'exemple (Côte-d'Or)..."
     
     # Check if we already have the main sample file
-    if [ -f "data/cote_dor_sample.shp" ]; then
+    if [ -f "data/cote_dor_sample.gpkg" ]; then
         print_warning "Données Côte-d'Or déjà présentes"
-        # Create symlink for compatibility
-        if [ ! -f "data/sample_shapefile.shp" ]; then
-            cd data
-            for ext in shp shx dbf prj cpg; do
-                [ -f "cote_dor_sample.$ext" ] && ln -sf "cote_dor_sample.$ext" "sample_shapefile.$ext"
-            done
-            cd ..
-        fi
         return 0
     fi
     
@@ -215,13 +207,6 @@ download_sample_data() {
     echo "  Génération des parcelles d'exemple..."
     ./venv/bin/python scripts/prepare_demo_data.py
     
-    # Create symlinks for compatibility
-    cd data
-    for ext in shp shx dbf prj cpg; do
-        [ -f "cote_dor_sample.$ext" ] && ln -sf "cote_dor_sample.$ext" "sample_shapefile.$ext"
-    done
-    cd ..
-    
     print_success "Données d'exemple générées (201 parcelles en Côte-d'Or)"
     echo ""
 }
@@ -229,14 +214,18 @@ download_sample_data() {
 load_data() {
     print_step "Chargement des données dans PostGIS..."
     
-    if [ ! -f "data/sample_shapefile.shp" ]; then
-        print_error "Aucun shapefile trouvé dans data/sample_shapefile.shp"
+    # Generated GeoPackage first, bundled shapefile otherwise
+    SAMPLE_FILE="data/cote_dor_sample.gpkg"
+    [ -f "$SAMPLE_FILE" ] || SAMPLE_FILE="data/sample_shapefile.shp"
+    
+    if [ ! -f "$SAMPLE_FILE" ]; then
+        print_error "Aucun fichier trouvé (data/cote_dor_sample.gpkg ou data/sample_shapefile.shp)"
         print_warning "Utilisez --sample-data pour télécharger un exemple"
         return 1
     fi
     
-    # Load shapefile
-    ./venv/bin/python scripts/load_shapefile.py --shp data/sample_shapefile.shp --infer-commune --mode replace
+    # Load sample data
+    ./venv/bin/python scripts/load_shapefile.py --shp "$SAMPLE_FILE" --infer-commune --mode replace
     
     echo ""
 }
@@ -344,7 +333,7 @@ main() {
     fi
     
     # Load data if available
-    if [ -f "data/sample_shapefile.shp" ]; then
+    if [ -f "data/cote_dor_sample.gpkg" ] || [ -f "data/sample_shapefile.shp" ]; then
         load_data
         run_queries "$@"
     else
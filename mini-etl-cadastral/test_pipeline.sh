@@ -67,7 +67,7 @@ fi
 # Test 5: Vérification des données
 echo ""
 echo "5. Test des données..."
-if [ -f "data/cote_dor_sample.shp" ]; then
+if [ -f "data/cote_dor_sample.gpkg" ]; then
     echo -e "${GREEN}✓${NC} Données Côte-d'Or présentes"
 else
     echo -e "${YELLOW}⚠${NC} Génération des données d'exemple..."
@@ -77,7 +77,7 @@ fi
 # Test 6: Chargement des données
 echo ""
 echo "6. Test de chargement..."
-venv/bin/python scripts/load_shapefile.py --shp data/cote_dor_sample.shp --mode replace 2>&1 | grep -q "Successfully loaded"
+venv/bin/python scripts/load_shapefile.py --shp data/cote_dor_sample.gpkg --mode replace 2>&1 | grep -q "Successfully loaded"
 if [ $? -eq 0 ]; then
     echo -e "${GREEN}✓${NC} Chargement des données réussi"
 else